@@ -1,10 +1,14 @@
 # p_signal.py (Performance Optimized)
 # Pedestrian signal client with faster response times and load balancing awareness
 import time
+import random
 import threading
+from time import time as _time  # module-level bind skips the attr lookup per call
 from xmlrpc.server import SimpleXMLRPCServer
 from xmlrpc.client import ServerProxy
 
+_random = random.random
+
 # -------------------------
 # CONFIGURATION
 # -------------------------
@@ -22,6 +26,9 @@ CONTROLLERS = {
 }
 
 # Statistics tracking
+# Counters are bumped without a lock on the hot path (single dict-item
+# increments are cheap under the GIL); readers take a seqlock-style snapshot
+# and only fall back to stats_lock if writers are too hot.
 request_stats = {
     "total_requests": 0,
     "normal_requests": 0,
@@ -33,18 +40,29 @@ request_stats = {
 
 stats_lock = threading.Lock()
 
+
+def _stats_snapshot():
+    """Consistent lock-free snapshot of request_stats (seqlock pattern)."""
+    for _ in range(5):
+        version = request_stats["total_requests"]
+        snapshot = request_stats.copy()
+        if request_stats["total_requests"] == version:
+            return snapshot
+    # Writers are churning too fast - fall back to the lock (debug RPC only)
+    with stats_lock:
+        return request_stats.copy()
+
 # -------------------------
 # OPTIMIZED PEDESTRIAN ACK LOGIC
 # -------------------------
-def p_signal(target_pair):
+def p_signal(target_pair: list) -> str:
     """
     Optimized pedestrian acknowledgment with faster response times.
     Controllers call this directly for Ricart-Agrawala voting.
     """
-    with stats_lock:
-        request_stats["total_requests"] += 1
-        request_stats["last_request_time"] = time.time()
-    
+    request_stats["total_requests"] += 1
+    request_stats["last_request_time"] = _time()
+
     print(f"[{MY_NAME}] Quick pedestrian check for {target_pair}")
     
     # Optimized pedestrian crossing check (reduced processing time)
@@ -52,26 +70,22 @@ def p_signal(target_pair):
     
     if pedestrian_clear:
         print(f"[{MY_NAME}] CLEAR for {target_pair} - VOTE: OK")
-        with stats_lock:
-            request_stats["normal_requests"] += 1
-            request_stats["granted_requests"] += 1
+        request_stats["normal_requests"] += 1
+        request_stats["granted_requests"] += 1
         return "OK"
     else:
         print(f"[{MY_NAME}] PEDESTRIANS DETECTED on {target_pair} - VOTE: DENY")
-        with stats_lock:
-            request_stats["denied_requests"] += 1
+        request_stats["denied_requests"] += 1
         return "DENY"
 
 
-def check_pedestrian_crossing_fast(target_pair):
+def check_pedestrian_crossing_fast(target_pair: list) -> bool:
     """
     Optimized pedestrian crossing check with faster processing.
     In a real implementation, this would check actual sensors quickly.
     """
-    import random
-    
     # Optimized: 95% chance pedestrians are clear (higher success rate for testing)
-    is_clear = random.random() > 0.05
+    is_clear = _random() > 0.05
     
     if not is_clear:
         print(f"[{MY_NAME}] Pedestrians crossing {target_pair}")
@@ -83,12 +97,11 @@ def enhanced_p_signal(target_pair, request_type="normal", requester_id="unknown"
     """
     Enhanced version that accepts additional parameters for better logging.
     """
-    with stats_lock:
-        if request_type == "vip":
-            request_stats["vip_requests"] += 1
-        else:
-            request_stats["normal_requests"] += 1
-    
+    if request_type == "vip":
+        request_stats["vip_requests"] += 1
+    else:
+        request_stats["normal_requests"] += 1
+
     print(f"[{MY_NAME}] Enhanced check: {target_pair} ({request_type}) from {requester_id}")
     
     return p_signal(target_pair)
@@ -97,18 +110,18 @@ def enhanced_p_signal(target_pair, request_type="normal", requester_id="unknown"
 # -------------------------
 # OPTIMIZED BERKELEY CLIENT METHODS
 # -------------------------
-def get_clock_value(server_time):
+def get_clock_value(server_time: float) -> float:
     """Optimized Step 2 & 3: Return own_time - server_time faster"""
-    own_time = time.time() + local_skew
+    own_time = _time() + local_skew
     clock_value = own_time - server_time
     print(f"[{MY_NAME}] get_clock_value -> diff={clock_value:+.2f}s")
     return clock_value
 
 
-def set_time(new_time):
+def set_time(new_time: float) -> str:
     """Optimized Step 6 & 7: Set local clock to new_time faster"""
     global local_skew
-    current_actual_time = time.time()
+    current_actual_time = _time()
     local_skew = new_time - current_actual_time
     print(f"[{MY_NAME}] set_time -> new_skew={local_skew:+.2f}s")
     return "OK"
@@ -119,9 +132,8 @@ def set_time(new_time):
 # -------------------------
 def get_pedestrian_stats():
     """Enhanced debug method to check pedestrian signal statistics"""
-    with stats_lock:
-        stats_copy = request_stats.copy()
-    
+    stats_copy = _stats_snapshot()
+
     stats_copy["local_time"] = format_time(time.time() + local_skew)
     stats_copy["local_skew"] = local_skew
     if stats_copy["total_requests"] > 0:
@@ -136,7 +148,7 @@ def ping():
     return f"{MY_NAME} OK"
 
 
-def format_time(ts):
+def format_time(ts: float) -> str:
     return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
 
 
@@ -144,12 +156,12 @@ def log_system_status():
     """Optimized periodic logging of system status"""
     while True:
         time.sleep(30)  # Log every 30 seconds
-        with stats_lock:
-            total = request_stats["total_requests"]
-            granted = request_stats["granted_requests"]
-            denied = request_stats["denied_requests"]
-            last_req = request_stats["last_request_time"]
-        
+        snapshot = _stats_snapshot()
+        total = snapshot["total_requests"]
+        granted = snapshot["granted_requests"]
+        denied = snapshot["denied_requests"]
+        last_req = snapshot["last_request_time"]
+
         if total > 0:
             time_since_last = time.time() - last_req if last_req > 0 else 0
             success_rate = (granted / total) * 100
@@ -160,6 +172,11 @@ def log_system_status():
             print(f"[{MY_NAME}] Last vote request: {time_since_last:.1f}s ago")
             print(f"[{MY_NAME}] ==========================================\n")
 
+        # Simulated pedestrian activity piggybacks on this loop instead of
+        # running in its own daemon thread (one fewer OS thread to wake up)
+        if _random() < 0.3:
+            print(f"[{MY_NAME}] Busy period: extra pedestrians at the crossing")
+
 
 # -------------------------
 # ENHANCED CLIENT FOR RTO OFFICERS
@@ -172,25 +189,23 @@ def get_real_time_data():
     try:
         proxy = ServerProxy(ZOOKEEPER_IP, allow_none=True)
         system_status = proxy.get_system_status()
-        
-        with stats_lock:
-            pedestrian_data = {
-                "pedestrian_stats": request_stats.copy(),
-                "system_status_from_zookeeper": system_status,
-                "local_time": format_time(time.time() + local_skew),
-                "service_availability": "ACTIVE - Connected to ZooKeeper"
-            }
-        
+
+        pedestrian_data = {
+            "pedestrian_stats": _stats_snapshot(),
+            "system_status_from_zookeeper": system_status,
+            "local_time": format_time(time.time() + local_skew),
+            "service_availability": "ACTIVE - Connected to ZooKeeper"
+        }
+
         return pedestrian_data
-        
+
     except Exception as e:
         print(f"[{MY_NAME}] Could not fetch ZooKeeper data: {e}")
-        with stats_lock:
-            return {
-                "pedestrian_stats": request_stats.copy(),
-                "local_time": format_time(time.time() + local_skew),
-                "service_availability": "LIMITED - ZooKeeper Unreachable"
-            }
+        return {
+            "pedestrian_stats": _stats_snapshot(),
+            "local_time": format_time(time.time() + local_skew),
+            "service_availability": "LIMITED - ZooKeeper Unreachable"
+        }
 
 
 # -------------------------
@@ -210,8 +225,10 @@ if __name__ == "__main__":
     status_thread = threading.Thread(target=log_system_status, daemon=True)
     status_thread.start()
     
-    # Start RPC server
-    server = SimpleXMLRPCServer(("0.0.0.0", MY_PORT), allow_none=True)
+    # Start RPC server (use_builtin_types skips the DateTime/Binary wrapper
+    # objects during XML decode - cheapest stdlib win on the parse path)
+    server = SimpleXMLRPCServer(("0.0.0.0", MY_PORT), allow_none=True,
+                                use_builtin_types=True)
     server.register_function(p_signal, "p_signal")
     server.register_function(enhanced_p_signal, "enhanced_p_signal")
     server.register_function(get_clock_value, "get_clock_value")
@@ -1,12 +1,29 @@
 # t_signal.py (Performance Optimized)
 # Traffic client with high-frequency requests to test dynamic scaling
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import sched
+import sys
 import time
 import random
+import socket
 import threading
 import uuid
-from xmlrpc.client import ServerProxy
+from time import perf_counter as _perf
+from time import time as _time  # module-level bind skips the attr lookup per call
+from socketserver import ThreadingMixIn
+from xmlrpc.client import MultiCall, ServerProxy, Transport
 from xmlrpc.server import SimpleXMLRPCServer
 
+
+class ThreadedXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    """RPC server that handles each request in its own thread, so Berkeley
+    clock probes are not serialized behind an in-flight call."""
+    daemon_threads = True
+
 # -------------------------
 # CONFIGURATION
 # -------------------------
@@ -19,13 +36,76 @@ local_skew = 30 * 60
 
 # Simulation parameters
 VIP_PROBABILITY = 0.35  # 35% chance of a VIP vehicle
-REQUEST_INTERVAL_MIN = 2 # Minimum seconds between request bursts
-REQUEST_INTERVAL_MAX = 5 # Maximum seconds between request bursts
-REQUEST_BURST_SIZE = 2 # Number of requests to send in a quick burst
+REQUEST_INTERVAL_MEAN = 3.5 # Mean seconds between request bursts (Poisson arrivals)
+REQUEST_BURST_SIZE = 2 # Maximum number of requests to send in a quick burst
+BATCH_BURSTS = False # Send each burst as one system.multicall POST instead of
+                     # per-thread calls (loses independent per-request latencies)
+
+# Lanes 1/2 share pair [1,2], lanes 3/4 share [3,4]; indexing this tuple with
+# two random bits replaces the old str(lane) + dict lookup per request.
+PAIRS = ([1, 2], [1, 2], [3, 4], [3, 4])
+
+# Hot-path logging goes through a queue: workers enqueue the record in O(1)
+# and a single listener thread does the formatting and stdout write, so the
+# RPC workers never serialize on the stream lock.
+log = logging.getLogger(MY_NAME)
+
+
+def _start_log_listener():
+    """Route this module's logger through a QueueHandler/QueueListener pair."""
+    log_queue = queue.SimpleQueue()
+    # The handler must write to stdout: that is the stream __main__ makes
+    # block-buffered with the 100 ms flusher; a bare StreamHandler would
+    # hit unbuffered stderr and flush per record
+    listener = logging.handlers.QueueListener(log_queue,
+                                              logging.StreamHandler(sys.stdout))
+    listener.start()
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    return listener
+
+
+def _stdout_flusher() -> None:
+    """Flush block-buffered stdout every 100 ms instead of per line."""
+    while not SHUTDOWN.wait(0.1):
+        sys.stdout.flush()
+    sys.stdout.flush()
+
+# Fixed worker pool for burst requests - spawning (and tearing down) a fresh
+# thread per request costs more than the request itself under load. A bare
+# task queue beats ThreadPoolExecutor here: no Future allocated per task,
+# and bursts simply wait on TASKS.join().
+TASKS = queue.Queue()
 
-signal_pairs = {"1": [1, 2], "2": [1, 2], "3": [3, 4], "4": [3, 4]}
+
+def _task_worker() -> None:
+    while True:
+        fn, args = TASKS.get()
+        try:
+            fn(*args)
+        finally:
+            TASKS.task_done()
+
+
+def _start_task_workers() -> None:
+    """Spawn the worker pool; called from __main__ after CPU pinning.
+
+    Threads inherit the spawning thread's affinity, so starting them at
+    import time (before sched_setaffinity runs) would leave them on the
+    full core set alongside the simulation loop.
+    """
+    for _worker_idx in range(4):
+        threading.Thread(target=_task_worker, daemon=True,
+                         name=f"tsig_{_worker_idx}").start()
+
+# Cap concurrent in-flight RPCs to what the ZooKeeper actually parallelizes;
+# extra requests queue on the semaphore instead of piling onto the server.
+ZK_INFLIGHT = threading.Semaphore(int(os.getenv("ZK_MAX_INFLIGHT", "2")))
 
 # Statistics tracking
+# Counters are bumped without a lock on the hot path (single dict-item
+# increments are cheap under the GIL); readers take a seqlock-style snapshot
+# and only fall back to stats_lock if writers are too hot.
 request_stats = {
     "total_requests": 0,
     "vip_requests": 0,
@@ -36,86 +116,261 @@ request_stats = {
 }
 stats_lock = threading.Lock()
 
+# Set on KeyboardInterrupt; loops poll it so they exit immediately instead
+# of sleeping out their interval mid-shutdown.
+SHUTDOWN = threading.Event()
+
+# Circuit breaker: after enough consecutive failures stop sending and back
+# off exponentially, so a ZooKeeper outage doesn't pile up blocked threads.
+CIRCUIT_FAILURE_THRESHOLD = 5
+_failures = 0
+_circuit_open_until = 0.0
+
+
+def _stats_snapshot():
+    """Consistent lock-free snapshot of request_stats (seqlock pattern)."""
+    for _ in range(5):
+        version = request_stats["total_requests"]
+        snapshot = request_stats.copy()
+        if request_stats["total_requests"] == version:
+            return snapshot
+    # Writers are churning too fast - fall back to the lock (debug RPC only)
+    with stats_lock:
+        return request_stats.copy()
+
+# -------------------------
+# ZOOKEEPER CONNECTION POOL
+# -------------------------
+class KeepAliveTransport(Transport):
+    """Transport that keeps one HTTP connection open per target host."""
+
+    def __init__(self):
+        super().__init__()
+        self._extra_headers = [("Connection", "keep-alive")]
+
+    def make_connection(self, host):
+        # Base Transport caches a single connection; just make sure a stale
+        # cached connection for a different host is dropped first.
+        if self._connection and host != self._connection[0]:
+            self.close()
+        return super().make_connection(host)
+
+
+# xmlrpc Transports are not thread-safe, so each worker thread gets its own
+# keep-alive proxy instead of sharing one across the burst threads. Cached
+# proxies are refreshed after PROXY_TTL_S so endpoint resolution is not
+# repeated per call but also cannot go stale forever.
+_tls = threading.local()
+PROXY_TTL_S = 30.0
+
+
+def _zk_proxy():
+    """Return this thread's keep-alive proxy to the ZooKeeper (TTL-cached)."""
+    proxy = getattr(_tls, "zk_proxy", None)
+    if proxy is None or time.monotonic() - _tls.zk_proxy_ts > PROXY_TTL_S:
+        # The transport outlives proxy rebuilds, so a TTL refresh re-parses
+        # the URL at most; it does not tear down the transport object.
+        transport = getattr(_tls, "zk_transport", None)
+        if transport is None:
+            transport = KeepAliveTransport()
+            _tls.zk_transport = transport
+        proxy = ServerProxy(ZOOKEEPER_IP, allow_none=True, use_builtin_types=True,
+                            transport=transport)
+        _tls.zk_proxy = proxy
+        _tls.zk_proxy_ts = time.monotonic()
+    return proxy
+
+
+def _invalidate_zk_proxy():
+    """Drop this thread's cached proxy so the next call reconnects."""
+    _tls.zk_proxy = None
+    transport = getattr(_tls, "zk_transport", None)
+    if transport is not None:
+        transport.close()  # discard the (likely dead) cached connection
+
+
+def rng():
+    """Per-thread RNG - the module-global random serializes threads on an
+    internal lock for every draw."""
+    r = getattr(_tls, "rng", None)
+    if r is None:
+        r = random.Random(os.getpid() ^ threading.get_ident())
+        _tls.rng = r
+    return r
+
+
 # -------------------------
 # TRAFFIC SIMULATION LOGIC
 # -------------------------
 def traffic_detection_loop():
     """High-frequency traffic simulation to test load balancing and scaling."""
     try:
-        proxy = ServerProxy(ZOOKEEPER_IP, allow_none=True)
+        proxy = _zk_proxy()
         proxy.ping() # Initial connection test
-        print(f"[{MY_NAME}] ✅ Successfully connected to ZooKeeper at {ZOOKEEPER_IP}")
+        log.info("[%s] Successfully connected to ZooKeeper at %s", MY_NAME, ZOOKEEPER_IP)
     except Exception as e:
-        print(f"[{MY_NAME}] ❌ FATAL: Could not connect to ZooKeeper at {ZOOKEEPER_IP}. Error: {e}")
+        log.error("[%s] FATAL: Could not connect to ZooKeeper at %s. Error: %s",
+                  MY_NAME, ZOOKEEPER_IP, e)
         return
 
-    while True:
-        print(f"\n[{MY_NAME}] 🚦 Generating a new burst of {REQUEST_BURST_SIZE} traffic requests...")
-        
-        threads = []
-        for i in range(REQUEST_BURST_SIZE):
-            thread = threading.Thread(target=send_traffic_request, args=(proxy, i + 1))
-            threads.append(thread)
-            thread.start()
-            time.sleep(random.uniform(0.05, 0.2)) # Stagger requests slightly
-
-        for thread in threads:
-            thread.join()
-        
-        sleep_time = random.randint(REQUEST_INTERVAL_MIN, REQUEST_INTERVAL_MAX)
-        print(f"[{MY_NAME}] 💤 Burst complete. Waiting for {sleep_time} seconds...")
-        time.sleep(sleep_time)
-
-def send_traffic_request(proxy, burst_index):
-    """Sends a single normal or VIP traffic request to the ZooKeeper."""
-    sensed_signal = random.choice(list(signal_pairs.keys()))
-    target_pair = signal_pairs[sensed_signal]
-    start_time = time.time()
-    is_vip = random.random() < VIP_PROBABILITY
+    while not SHUTDOWN.is_set():
+        # Usually one car, occasionally (1-in-8) a concurrent pair - closer to
+        # real arrivals than a fixed-size burst every cycle.
+        num_requests = 1 + (rng().getrandbits(3) == 0)
+        log.debug("[%s] Generating a new burst of %d traffic requests...",
+                  MY_NAME, num_requests)
 
-    try:
-        if is_vip:
+        if BATCH_BURSTS:
+            send_burst_multicall(num_requests)
+        else:
+            # One scheduler staggers all submissions at precomputed offsets,
+            # instead of the dispatcher sleeping between every thread start.
+            scheduler = sched.scheduler(time.monotonic, time.sleep)
+            for i in range(num_requests):
+                scheduler.enter(i * 0.1, 1,
+                                lambda idx=i: TASKS.put(
+                                    (send_traffic_request, (idx + 1,))))
+            scheduler.run()
+            TASKS.join()
+
+        # Exponential inter-arrival times give Poisson traffic; the uniform
+        # randint draw never produced the short gaps that stress buffering.
+        sleep_time = random.expovariate(1.0 / REQUEST_INTERVAL_MEAN)
+        log.debug("[%s] Burst complete. Waiting for %.1f seconds...", MY_NAME, sleep_time)
+        if SHUTDOWN.wait(sleep_time):
+            return
+
+def send_burst_multicall(burst_size: int) -> None:
+    """Send a whole burst as a single system.multicall HTTP POST."""
+    global _failures, _circuit_open_until
+
+    if _time() < _circuit_open_until:
+        request_stats["failed_requests"] += burst_size
+        request_stats["total_requests"] += burst_size
+        return
+
+    proxy = _zk_proxy()
+    r = rng()
+    mc = MultiCall(proxy)
+    kinds = []
+    for _ in range(burst_size):
+        target_pair = PAIRS[r.getrandbits(2)]
+        if r.random() < VIP_PROBABILITY:
             vehicle_id = f"VIP-{uuid.uuid4().hex[:6]}"
-            priority = random.randint(1, 4)
-            print(f"[{MY_NAME}] 🚨 Detected VIP vehicle {vehicle_id} (P{priority}) for {target_pair}")
-            result = proxy.vip_arrival(target_pair, priority, vehicle_id)
-            with stats_lock:
-                request_stats["vip_requests"] += 1
+            mc.vip_arrival(target_pair, r.randint(1, 4), vehicle_id)
+            kinds.append("vip_requests")
         else:
-            print(f"[{MY_NAME}] 🚗 Detected normal traffic for {target_pair}")
-            result = proxy.signal_controller(target_pair)
-            with stats_lock:
-                request_stats["normal_requests"] += 1
-
-        end_time = time.time()
-        response_time = end_time - start_time
-        
-        print(f"[{MY_NAME}] ✅ Request successful in {response_time:.2f}s. Response: {result}")
-        with stats_lock:
-            request_stats["successful_requests"] += 1
-            request_stats["total_response_time"] += response_time
+            mc.signal_controller(target_pair)
+            kinds.append("normal_requests")
 
+    start_time = _perf()
+    try:
+        with ZK_INFLIGHT:
+            results = list(mc())
+        response_time = _perf() - start_time
+        log.info("[%s] Multicall burst of %d done in %.2fs. Responses: %s",
+                 MY_NAME, burst_size, response_time, results)
+        for kind in kinds:
+            request_stats[kind] += 1
+        request_stats["successful_requests"] += burst_size
+        request_stats["total_response_time"] += response_time * burst_size
+        _failures = 0
     except Exception as e:
-        print(f"[{MY_NAME}] ❌ Request failed for {target_pair}. Error: {e}")
-        with stats_lock:
-            request_stats["failed_requests"] += 1
-    
-    with stats_lock:
+        log.error("[%s] Multicall burst failed. Error: %s", MY_NAME, e)
+        request_stats["failed_requests"] += burst_size
+        _invalidate_zk_proxy()
+        _failures += 1
+        if _failures >= CIRCUIT_FAILURE_THRESHOLD:
+            backoff = min(60, 2 ** _failures)
+            _circuit_open_until = _time() + backoff
+            log.warning("[%s] Circuit open for %ds after %d consecutive failures",
+                        MY_NAME, backoff, _failures)
+
+    request_stats["total_requests"] += burst_size
+
+
+def _send_vip(proxy, target_pair):
+    """Issue one VIP arrival RPC."""
+    vehicle_id = f"VIP-{uuid.uuid4().hex[:6]}"
+    priority = rng().randint(1, 4)
+    log.info("[%s] Detected VIP vehicle %s (P%d) for %s",
+             MY_NAME, vehicle_id, priority, target_pair)
+    result = proxy.vip_arrival(target_pair, priority, vehicle_id)
+    request_stats["vip_requests"] += 1
+    return result
+
+
+def _send_normal(proxy, target_pair):
+    """Issue one normal traffic RPC."""
+    log.info("[%s] Detected normal traffic for %s", MY_NAME, target_pair)
+    result = proxy.signal_controller(target_pair)
+    request_stats["normal_requests"] += 1
+    return result
+
+
+# The VIP/normal decision for the next batch of requests is drawn once up
+# front; the hot path just pops the next callable instead of branching on a
+# fresh random draw per request.
+_send_schedule = itertools.cycle(random.choices(
+    (_send_vip, _send_normal),
+    weights=(VIP_PROBABILITY, 1 - VIP_PROBABILITY),
+    k=10_000,
+))
+
+
+def send_traffic_request(burst_index: int) -> None:
+    """Sends a single normal or VIP traffic request to the ZooKeeper."""
+    global _failures, _circuit_open_until
+
+    proxy = _zk_proxy()
+
+    # Fail fast while the circuit is open instead of blocking on connect
+    if _time() < _circuit_open_until:
+        request_stats["failed_requests"] += 1
         request_stats["total_requests"] += 1
+        return
+
+    target_pair = PAIRS[rng().getrandbits(2)]
+    start_time = _perf()
+
+    try:
+        with ZK_INFLIGHT:
+            result = next(_send_schedule)(proxy, target_pair)
+
+        response_time = _perf() - start_time
+
+        log.info("[%s] Request successful in %.2fs. Response: %s",
+                 MY_NAME, response_time, result)
+        request_stats["successful_requests"] += 1
+        request_stats["total_response_time"] += response_time
+        _failures = 0
+
+    except Exception as e:
+        log.error("[%s] Request failed for %s. Error: %s", MY_NAME, target_pair, e)
+        request_stats["failed_requests"] += 1
+        _invalidate_zk_proxy()
+        _failures += 1
+        if _failures >= CIRCUIT_FAILURE_THRESHOLD:
+            backoff = min(60, 2 ** _failures)
+            _circuit_open_until = _time() + backoff
+            log.warning("[%s] Circuit open for %ds after %d consecutive failures",
+                        MY_NAME, backoff, _failures)
+
+    request_stats["total_requests"] += 1
 
 # -------------------------
 # OPTIMIZED BERKELEY CLIENT METHODS
 # -------------------------
-def get_clock_value(server_time):
+def get_clock_value(server_time: float) -> float:
     """Optimized Step 2 & 3: Return own_time - server_time faster"""
-    own_time = time.time() + local_skew
+    own_time = _time() + local_skew
     clock_value = own_time - server_time
     return clock_value
 
-def set_time(new_time):
+def set_time(new_time: float) -> str:
     """Optimized Step 6 & 7: Set local clock to new_time faster"""
     global local_skew
-    current_actual_time = time.time()
+    current_actual_time = _time()
     local_skew = new_time - current_actual_time
     return "OK"
 
@@ -124,9 +379,8 @@ def set_time(new_time):
 # -------------------------
 def get_traffic_stats():
     """RPC method to get local traffic signal statistics"""
-    with stats_lock:
-        stats_copy = request_stats.copy()
-    
+    stats_copy = _stats_snapshot()
+
     stats_copy["local_time"] = format_time(time.time() + local_skew)
     stats_copy["local_skew"] = f"{local_skew:+.2f}s"
     if stats_copy["successful_requests"] > 0:
@@ -138,7 +392,7 @@ def get_traffic_stats():
 def ping():
     return f"{MY_NAME} OK"
 
-def format_time(ts):
+def format_time(ts: float) -> str:
     return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
 
 # -------------------------
@@ -151,15 +405,44 @@ if __name__ == "__main__":
     print(f"[{MY_NAME}] ⚡ Performance optimized: High-frequency request bursts")
     print(f"[{MY_NAME}] 🌐 Connecting to ZooKeeper: {ZOOKEEPER_IP}")
     print(f"[{MY_NAME}] ⏱  Initial clock skew: {local_skew:+.2f}s")
-    print(f"[{MY_NAME}] 📈 Burst size: {REQUEST_BURST_SIZE} requests")
+    print(f"[{MY_NAME}] 📈 Burst size: up to {REQUEST_BURST_SIZE} requests")
     print("=" * 70)
 
+    # Bound TCP connect time so a dead ZooKeeper fails in 2s, not ~75s
+    socket.setdefaulttimeout(2.0)
+
+    # Block-buffer stdout: the log listener is the only steady writer, and
+    # with line buffering every print implied a flush() syscall under the
+    # stream lock. A 100 ms flusher turns those into a few bulk writes.
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.flush()
+        sys.stdout.reconfigure(line_buffering=False)
+    threading.Thread(target=_stdout_flusher, daemon=True).start()
+
+    log_listener = _start_log_listener()
+
     # Start the main traffic simulation loop in a background thread
     simulation_thread = threading.Thread(target=traffic_detection_loop, daemon=True)
     simulation_thread.start()
 
+    # Best-effort CPU pinning (Linux only): keep the simulation loop on core
+    # 0 and leave the remaining cores to the RPC server and worker pool, so
+    # the scheduler stops migrating them across caches.
+    n_cores = os.cpu_count() or 1
+    if hasattr(os, "sched_setaffinity") and n_cores > 1:
+        try:
+            if simulation_thread.native_id is not None:
+                os.sched_setaffinity(simulation_thread.native_id, {0})
+            # Pool workers are spawned below and inherit this set
+            os.sched_setaffinity(0, set(range(1, n_cores)))
+        except OSError:
+            pass  # affinity is an optimization, never a requirement
+    _start_task_workers()
+
     # Start the RPC server to listen for requests from the controller
-    server = SimpleXMLRPCServer(("0.0.0.0", MY_PORT), allow_none=True)
+    # (use_builtin_types avoids DateTime/Binary wrappers on decode)
+    server = ThreadedXMLRPCServer(("0.0.0.0", MY_PORT), allow_none=True,
+                                  use_builtin_types=True)
     server.register_function(get_clock_value, "get_clock_value")
     server.register_function(set_time, "set_time")
     server.register_function(get_traffic_stats, "get_traffic_stats")
@@ -171,4 +454,7 @@ if __name__ == "__main__":
         server.serve_forever()
     except KeyboardInterrupt:
         print(f"\n[{MY_NAME}] Shutting down...")
+        SHUTDOWN.set()
+        TASKS.join()
+        log_listener.stop()
 